@@ -1,16 +1,20 @@
 import httpx
+from telegram import Update
 from telegram.ext import (
     Application,
     ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
     MessageHandler,
+    TypeHandler,
     filters,
 )
 
 from core.config import settings
 from db.manager import create_db_pool, setup_database
-from bot.handlers import start_command, handle_text_input
+from bot.handlers import start_command, leaderboard_command, handle_text_input
+from bot.jobs import start_background_jobs, stop_background_jobs
+from bot.middleware import UpdateGuard, guard_update
 from bot.callbacks import (
     main_menu_callback, create_game_prompt_stake_callback, check_balance_callback,
     deposit_prompt_callback, withdraw_prompt_callback, create_game_stake_callback,
@@ -23,11 +27,13 @@ async def post_init(application: Application):
     application.bot_data['pool'] = pool
     # The DB setup is run from render.yaml buildCommand, not here, to avoid race conditions.
     application.bot_data['http_session'] = httpx.AsyncClient()
+    start_background_jobs(application)
     webhook_url = f"{settings.WEBHOOK_URL}/api/telegram/webhook"
     await application.bot.set_webhook(url=webhook_url, allowed_updates=["message", "callback_query"])
 
 async def post_shutdown(application: Application):
     """Runs before application shuts down."""
+    await stop_background_jobs(application)
     if 'pool' in application.bot_data:
         await application.bot_data['pool'].close()
     if 'http_session' in application.bot_data:
@@ -43,8 +49,13 @@ def create_bot_app() -> Application:
         .build()
     )
 
+    # Pre-handler guard: dedup, rate limiting and dead-game rejection, all in memory
+    application.bot_data['update_guard'] = UpdateGuard()
+    application.add_handler(TypeHandler(Update, guard_update), group=-1)
+
     # Command & Message Handlers
     application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(CommandHandler("leaderboard", leaderboard_command))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_input))
     
     # Callback Query Handlers
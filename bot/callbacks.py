@@ -1,11 +1,13 @@
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, Message
 from telegram.ext import ContextTypes
 from decimal import Decimal
 import asyncio
 
-from db.manager import get_user_balance, update_user_balance, create_game, get_game, update_game
+from db.manager import get_user_balance, update_user_balance, create_game, get_active_game, update_game, set_game_message, settle_game
 from bot.game_logic import LudoGame
-from bot.renderer import render_board
+from bot.renderer import render_board, render_caption
+from bot import image_renderer
+from bot.middleware import close_game
 from core.config import settings
 
 async def main_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -62,7 +64,11 @@ async def create_game_final_callback(update: Update, context: ContextTypes.DEFAU
     game_id = await create_game(context.bot_data['pool'], game.state)
     
     keyboard = [[InlineKeyboardButton("Join Game 🤝", callback_data=f"join_game_{game_id}")]]
-    await query.message.edit_text(f"{user.username or user.first_name} started a game for {stake} ETB!\nWin Condition: {win_condition} token(s) home.", reply_markup=InlineKeyboardMarkup(keyboard))
+    await query.message.edit_text(
+        f"{user.username or user.first_name} started a game for {stake} ETB!\nWin Condition: {win_condition} token(s) home.\n"
+        f"Dice seed hash: {game.state['rng']['seed_hash']}",
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
 
 async def join_game_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -70,7 +76,9 @@ async def join_game_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     game_id = int(query.data.split('_')[-1])
     pool = context.bot_data['pool']
     
-    game_data = await get_game(pool, game_id)
+    game_data = await get_active_game(pool, game_id)
+    if not game_data:
+        close_game(context, game_id)
     if not game_data or game_data['status'] != 'lobby':
         await query.answer("Game not available.", show_alert=True)
         return
@@ -93,19 +101,37 @@ async def join_game_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await query.answer("Stake collection failed.", show_alert=True)
         return
     
-    game.add_player(user.id, user.username or user.first_name)
     game.state.update({'game_id': game_id, 'chat_id': query.message.chat_id, 'message_id': query.message.message_id})
-    await update_game(pool, game_id, game.state, 'active')
-    
-    board_text = render_board(game.state)
+    game.add_player(user.id, user.username or user.first_name)
+    # Persist before any Telegram call so collected stakes always belong to an active game.
+    if not await update_game(pool, game_id, game_data['created_at'], game.state, 'active', from_statuses=('lobby',)):
+        # Someone else joined (or the lobby expired) in the meantime: give both stakes back.
+        await update_user_balance(pool, creator_id, Decimal(stake), 'add')
+        await update_user_balance(pool, user.id, Decimal(stake), 'add')
+        await query.answer("Game not available.", show_alert=True)
+        return
+
     keyboard = get_game_keyboard(game.state)
-    await query.message.edit_text(board_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='MarkdownV2')
+    if image_renderer.is_available():
+        # The lobby message is text and cannot become a photo, so the board gets its own message.
+        key, media = image_renderer.board_media(game.state)
+        message = await query.message.reply_photo(media, caption=render_caption(game.state), reply_markup=InlineKeyboardMarkup(keyboard))
+        _remember_board_upload(key, message)
+        await set_game_message(pool, game_id, game_data['created_at'], {'message_id': message.message_id, 'board_image': True})
+        await query.message.edit_text(f"Game #{game_id} started!")
+    else:
+        await query.message.edit_text(render_board(game.state), reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='MarkdownV2')
     asyncio.create_task(check_game_timeout(context, game_id))
 
 async def roll_dice_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query, user, pool = update.callback_query, update.effective_user, context.bot_data['pool']
     game_id = int(query.data.split('_')[-1])
-    game_data = await get_game(pool, game_id)
+    game_data = await get_active_game(pool, game_id)
+    if not game_data:
+        close_game(context, game_id)
+    if not game_data or game_data['status'] != 'active':
+        await query.answer("Game not available.", show_alert=True)
+        return
     game = LudoGame(game_data['game_state'])
 
     if user.id != game.current_player_id():
@@ -113,33 +139,62 @@ async def roll_dice_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
 
     game.roll_dice()
-    await update_game(pool, game_id, game.state, game.state['status'])
-    board_text = render_board(game.state)
+    if not await update_game(pool, game_id, game_data['created_at'], game.state, game.state['status']):
+        close_game(context, game_id)
+        await query.answer("Game not available.", show_alert=True)
+        return
     keyboard = get_game_keyboard(game.state)
-    await query.message.edit_text(board_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='MarkdownV2')
+    await show_board(query.message, game.state, keyboard)
 
 async def move_token_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query, user, pool = update.callback_query, update.effective_user, context.bot_data['pool']
     _, _, game_id_str, token_index_str = query.data.split('_')
     game_id, token_index = int(game_id_str), int(token_index_str)
-    game_data = await get_game(pool, game_id)
+    game_data = await get_active_game(pool, game_id)
+    if not game_data:
+        close_game(context, game_id)
+    if not game_data or game_data['status'] != 'active':
+        await query.answer("Game not available.", show_alert=True)
+        return
     game = LudoGame(game_data['game_state'])
 
     if user.id != game.current_player_id():
         await query.answer("It's not your turn!", show_alert=True)
         return
 
-    win_info = game.move_token(user.id, token_index)
+    try:
+        win_info = game.move_token(user.id, token_index)
+    except ValueError:
+        await query.answer("That move is not allowed.", show_alert=True)
+        return
     if win_info:
         winner_id = win_info['winner']
         pot = game.state['pot']
         prize = Decimal(pot) - (Decimal(pot) * Decimal(settings.OWNER_COMMISSION_RATE))
-        await update_user_balance(pool, winner_id, prize, 'add')
-        
-    await update_game(pool, game_id, game.state, game.state['status'])
-    board_text = render_board(game.state)
+        settled = await settle_game(pool, game_id, game_data['created_at'], game.state, game.state['status'], winner_id, prize)
+        close_game(context, game_id)
+        if not settled:
+            await query.answer("Game already finished.", show_alert=True)
+            return
+    elif not await update_game(pool, game_id, game_data['created_at'], game.state, game.state['status']):
+        close_game(context, game_id)
+        await query.answer("Game not available.", show_alert=True)
+        return
     keyboard = get_game_keyboard(game.state) if not win_info else [[InlineKeyboardButton("Back to Menu", callback_data="main_menu")]]
-    await query.message.edit_text(board_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='MarkdownV2')
+    await show_board(query.message, game.state, keyboard)
+
+def _remember_board_upload(key: str, message):
+    if isinstance(message, Message) and message.photo:
+        image_renderer.remember_file_id(key, message.photo[-1].file_id)
+
+async def show_board(message: Message, game_state: dict, keyboard: list):
+    """Updates the game message with the board, as a cached image when the game uses image boards."""
+    if game_state.get('board_image') and image_renderer.is_available():
+        key, media = image_renderer.board_media(game_state)
+        edited = await message.edit_media(InputMediaPhoto(media, caption=render_caption(game_state)), reply_markup=InlineKeyboardMarkup(keyboard))
+        _remember_board_upload(key, edited)
+    else:
+        await message.edit_text(render_board(game_state), reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='MarkdownV2')
 
 def get_game_keyboard(game_state: dict) -> list:
     if game_state['status'] != 'active': return []
@@ -154,20 +209,29 @@ def get_game_keyboard(game_state: dict) -> list:
 async def check_game_timeout(context: ContextTypes.DEFAULT_TYPE, game_id: int):
     await asyncio.sleep(settings.GAME_TIMEOUT_SECONDS)
     pool = context.bot_data['pool']
-    game_data = await get_game(pool, game_id)
+    game_data = await get_active_game(pool, game_id)
     if not game_data or game_data['status'] != 'active': return
     
     # Simple check, assumes this coroutine is authoritative
     game = LudoGame(game_data['game_state'])
     winner_id = game.forfeit(game.current_player_id())
     pot, prize = game.state['pot'], Decimal(game.state['pot']) * (1 - Decimal(settings.OWNER_COMMISSION_RATE))
-    await update_user_balance(pool, winner_id, prize, 'add')
-    await update_game(pool, game_id, game.state, 'forfeited')
+    settled = await settle_game(pool, game_id, game_data['created_at'], game.state, 'forfeited', winner_id, prize)
+    close_game(context, game_id)
+    if not settled: return
     
-    board_text = render_board(game.state)
+    reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("Back to Menu", callback_data="main_menu")]])
     try:
-        await context.bot.edit_message_text(
-            chat_id=game.state['chat_id'], message_id=game.state['message_id'], text=board_text,
-            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Back to Menu", callback_data="main_menu")]])
-        )
+        if game.state.get('board_image') and image_renderer.is_available():
+            key, media = image_renderer.board_media(game.state)
+            edited = await context.bot.edit_message_media(
+                chat_id=game.state['chat_id'], message_id=game.state['message_id'],
+                media=InputMediaPhoto(media, caption=render_caption(game.state)), reply_markup=reply_markup
+            )
+            _remember_board_upload(key, edited)
+        else:
+            await context.bot.edit_message_text(
+                chat_id=game.state['chat_id'], message_id=game.state['message_id'], text=render_board(game.state),
+                reply_markup=reply_markup
+            )
     except: pass
\ No newline at end of file
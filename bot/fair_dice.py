@@ -0,0 +1,92 @@
+"""Provably-fair dice for Ludo games.
+
+Every game gets a secret server seed when it is created; only its SHA-256
+commitment is shown to players until the game ends. Roll number `n` of a game is
+derived from HMAC-SHA512(seed, "<game_id>:<block>") where `block = n // DICE_PER_BLOCK`,
+so anyone holding the revealed seed can recompute every roll.
+"""
+import asyncio
+import hashlib
+import hmac
+import secrets
+import sys
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+DICE_PER_BLOCK = 32
+
+def new_server_seed() -> str:
+    """Returns a fresh 256-bit server seed as hex."""
+    return secrets.token_hex(32)
+
+def seed_commitment(server_seed: str) -> str:
+    """Returns the hash published to players before the game starts."""
+    return hashlib.sha256(bytes.fromhex(server_seed)).hexdigest()
+
+@lru_cache(maxsize=4096)
+def dice_block(server_seed: str, game_id: int, block: int) -> Tuple[int, ...]:
+    """Generates DICE_PER_BLOCK unbiased rolls with one HMAC call (rarely two)."""
+    key = bytes.fromhex(server_seed)
+    dice: List[int] = []
+    extension = 0
+    while len(dice) < DICE_PER_BLOCK:
+        message = f"{game_id}:{block}" if extension == 0 else f"{game_id}:{block}:{extension}"
+        digest = hmac.new(key, message.encode(), hashlib.sha512).digest()
+        # Bytes >= 252 are rejected so every face keeps a 42/252 chance.
+        dice.extend(b % 6 + 1 for b in digest if b < 252)
+        extension += 1
+    return tuple(dice[:DICE_PER_BLOCK])
+
+def roll_for(server_seed: str, game_id: int, counter: int) -> int:
+    """Returns roll number `counter` (0-based) of a game."""
+    return dice_block(server_seed, game_id, counter // DICE_PER_BLOCK)[counter % DICE_PER_BLOCK]
+
+def first_player_swapped(server_seed: str, game_id: int) -> bool:
+    """Decides, from the seed, whether the joining player moves first."""
+    digest = hmac.new(bytes.fromhex(server_seed), f"{game_id}:order".encode(), hashlib.sha256).digest()
+    return bool(digest[0] & 1)
+
+def verify_game(game_state: Dict[str, Any]) -> List[str]:
+    """Replays a finished game's recorded rolls against its revealed seed. Returns a list of problems."""
+    rng = game_state.get('rng')
+    if not rng:
+        return ["game has no seed (created before provably-fair dice)"]
+    problems = []
+    if seed_commitment(rng['seed']) != rng['seed_hash']:
+        problems.append("server seed does not match its commitment")
+    rolls = game_state.get('rolls', [])
+    if len(rolls) != rng['counter']:
+        problems.append(f"{rng['counter']} rolls were drawn but {len(rolls)} were recorded")
+    game_id = game_state['game_id']
+    for block_start in range(0, len(rolls), DICE_PER_BLOCK):
+        expected = dice_block(rng['seed'], game_id, block_start // DICE_PER_BLOCK)
+        for offset, actual in enumerate(rolls[block_start:block_start + DICE_PER_BLOCK]):
+            if expected[offset] != actual:
+                problems.append(f"roll {block_start + offset} was {actual}, seed gives {expected[offset]}")
+    return problems
+
+async def verify_games(game_ids: List[int]) -> Dict[int, List[str]]:
+    """Loads games from the database and verifies each one's rolls."""
+    from db.manager import create_db_pool, get_game
+
+    pool = await create_db_pool()
+    results = {}
+    try:
+        for game_id in game_ids:
+            game_data = await get_game(pool, game_id)
+            if not game_data:
+                results[game_id] = ["game not found"]
+            elif game_data['status'] in ('lobby', 'active'):
+                results[game_id] = ["game is still in progress; its seed is not revealed yet"]
+            else:
+                results[game_id] = verify_game(game_data['game_state'])
+    finally:
+        await pool.close()
+    return results
+
+if __name__ == "__main__":
+    # Usage: python -m bot.fair_dice <game_id> [<game_id> ...]
+    results = asyncio.run(verify_games([int(arg) for arg in sys.argv[1:]]))
+    for game_id, problems in results.items():
+        print(f"Game {game_id}: {'OK' if not problems else '; '.join(problems)}")
+    sys.exit(1 if any(results.values()) else 0)
@@ -1,6 +1,7 @@
-import random
 from typing import Dict, List, Optional, Any
 
+from bot.fair_dice import new_server_seed, seed_commitment, roll_for, first_player_swapped
+
 class LudoGame:
     """Manages the state and rules of a Ludo game."""
 
@@ -12,10 +13,18 @@ class LudoGame:
 
     def __init__(self, state: Dict[str, Any]):
         self.state = state
+        # JSON round-trips turn the integer player IDs used as dict keys into strings.
+        self.state['players'] = {int(pid): pdata for pid, pdata in state['players'].items()}
+        if state.get('winner') is not None:
+            state['winner'] = int(state['winner'])
 
     @classmethod
-    def new_game(cls, player1_id: int, player1_username: str, stake: int, win_condition: int) -> 'LudoGame':
-        """Initializes a brand new game waiting for a second player."""
+    def new_game(cls, player1_id: int, player1_username: str, stake: int, win_condition: int, server_seed: Optional[str] = None) -> 'LudoGame':
+        """Initializes a brand new game waiting for a second player.
+
+        Pass `server_seed` to reproduce a game (e.g. in simulations); otherwise a fresh one is drawn.
+        """
+        server_seed = server_seed or new_server_seed()
         state = {
             "players": {
                 player1_id: {
@@ -31,6 +40,9 @@ class LudoGame:
             "win_condition": win_condition, # 1, 2, or 4 tokens home
             "dice_roll": None,
             "roll_history": [],
+            "winner": None,
+            "rng": {"seed": server_seed, "seed_hash": seed_commitment(server_seed), "counter": 0},
+            "rolls": [],
             "game_id": None,
             "status": "lobby",
             "message_id": None,
@@ -48,16 +60,28 @@ class LudoGame:
             "tokens": [-1, -1, -1, -1]
         }
         self.state['player_order'].append(player2_id)
-        random.shuffle(self.state['player_order']) # Randomize who goes first
+        if first_player_swapped(self._rng()['seed'], self.state['game_id'] or 0): # Seeded choice of who goes first
+            self.state['player_order'].reverse()
         self.state['pot'] += self.state['stake_per_player']
         self.state['status'] = 'active'
 
     def current_player_id(self) -> int:
         return self.state['player_order'][self.state['turn_index']]
 
+    def _rng(self) -> Dict[str, Any]:
+        """Returns the game's seeded RNG state, seeding games created before it existed."""
+        if 'rng' not in self.state:
+            server_seed = new_server_seed()
+            self.state['rng'] = {"seed": server_seed, "seed_hash": seed_commitment(server_seed), "counter": 0}
+            self.state['rolls'] = []
+        return self.state['rng']
+
     def roll_dice(self) -> int:
         """Rolls the dice and handles turn logic for rolling 6."""
-        roll = random.randint(1, 6)
+        rng = self._rng()
+        roll = roll_for(rng['seed'], self.state['game_id'] or 0, rng['counter'])
+        rng['counter'] += 1
+        self.state['rolls'].append(roll)
         self.state['dice_roll'] = roll
         current_player_id = self.current_player_id()
         
@@ -98,11 +122,40 @@ class LudoGame:
         if token_pos >= 101: # In home path
             return token_pos + roll <= 107 # Cannot overshoot home
 
-        return True
+        blocks = self.opponent_blocks(player_id)
+        if token_pos == -1: # Cannot enter onto an opponent's block
+            return self.PLAYER_STARTS[player['color']] not in blocks
+        return not any(square in blocks for square in self.track_path(player['color'], token_pos, roll))
+
+    def track_path(self, color: str, token_pos: int, roll: int) -> List[int]:
+        """Main-track squares a token passes over and lands on, stopping at its home entry."""
+        home_entry = self.PLAYER_HOME_ENTRIES[color]
+        if token_pos == home_entry: # The whole move is on the home path
+            return []
+        path = []
+        for step in range(1, roll + 1):
+            square = (token_pos + step) % self.BOARD_SIZE
+            path.append(square)
+            if square == home_entry:
+                break
+        return path
+
+    def opponent_blocks(self, player_id: int) -> set:
+        """Main-track squares where another player has stacked two or more tokens."""
+        blocks = set()
+        for pid, pdata in self.state['players'].items():
+            if pid == player_id:
+                continue
+            for pos in pdata['tokens']:
+                if 0 <= pos < self.BOARD_SIZE and pdata['tokens'].count(pos) > 1:
+                    blocks.add(pos)
+        return blocks
 
     def move_token(self, player_id: int, token_index: int) -> Optional[Dict[str, Any]]:
         """Moves a token, handles knockouts, and checks for win condition."""
         roll = self.state['dice_roll']
+        if roll is None or not self.is_move_valid(player_id, token_index, roll):
+            raise ValueError("Invalid move.")
         player = self.state['players'][player_id]
         color = player['color']
         token_pos = player['tokens'][token_index]
@@ -120,8 +173,7 @@ class LudoGame:
         # 3. Standard move on main board
         else:
             home_entry = self.PLAYER_HOME_ENTRIES[color]
-            new_pos_abs = (self.PLAYER_STARTS[color] + token_pos) % self.BOARD_SIZE
-            
+
             # Check for passing home entry
             if token_pos <= home_entry < (token_pos + roll):
                 home_path_pos = 101 + (token_pos + roll - home_entry - 1)
@@ -136,6 +188,7 @@ class LudoGame:
         winner = self.check_win_condition()
         if winner:
             self.state['status'] = 'finished'
+            self.state['winner'] = winner
             return {'winner': winner}
         
         if roll != 6:
@@ -182,4 +235,5 @@ class LudoGame:
         """Forfeits the game for a player and returns the winner's ID."""
         self.state['status'] = 'forfeited'
         winner_id = [pid for pid in self.state['player_order'] if pid != player_id][0]
+        self.state['winner'] = winner_id
         return winner_id
\ No newline at end of file
@@ -5,8 +5,9 @@ import uuid
 import httpx
 
 from core.config import settings
-from db.manager import get_or_create_user, get_user_balance, create_deposit_transaction, create_withdrawal_request
+from db.manager import get_or_create_user, get_user_balance, create_deposit_transaction, create_withdrawal_request, get_user_stats
 from bot.game_logic import LudoGame
+from bot.jobs import refresh_leaderboard
 from db.manager import create_game
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -25,6 +26,28 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=reply_markup
     )
 
+async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    leaderboard = context.bot_data.get('leaderboard')
+    if leaderboard is None:
+        await refresh_leaderboard(context.application)
+        leaderboard = context.bot_data['leaderboard']
+
+    lines = ["🏆 Top Players"]
+    for rank, entry in enumerate(leaderboard['entries'], start=1):
+        name = entry['username'] or str(entry['telegram_id'])
+        lines.append(f"{rank}. {name}: {entry['net_winnings']:+.2f} ETB ({entry['games_won']}/{entry['games_played']} won)")
+    if not leaderboard['entries']:
+        lines.append("No games played yet.")
+
+    stats = await get_user_stats(context.bot_data['pool'], update.effective_user.id)
+    if stats:
+        losses = stats['games_played'] - stats['games_won']
+        lines.append(
+            f"\nYou: {stats['games_won']}W / {losses}L, staked {stats['total_staked']:.2f} ETB, "
+            f"net {stats['net_winnings']:+.2f} ETB, streak {stats['current_streak']} (best {stats['best_streak']})"
+        )
+    await update.message.reply_text("\n".join(lines))
+
 async def handle_text_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     next_step = context.user_data.get('next_step')
     if next_step == 'handle_deposit_amount':
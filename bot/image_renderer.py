@@ -0,0 +1,199 @@
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError: # Pillow is optional; callers fall back to the emoji board.
+    Image = ImageDraw = None
+
+from bot.game_logic import LudoGame
+
+CELL = 40
+BOARD_PX = 15 * CELL
+PNG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+FILE_ID_CACHE_MAX_ITEMS = 50_000
+
+COLORS = {'RED': (214, 48, 49), 'GREEN': (39, 174, 96), 'YELLOW': (241, 196, 15), 'BLUE': (41, 128, 185)}
+YARD_CORNERS = {'RED': (0, 0), 'GREEN': (9, 0), 'YELLOW': (9, 9), 'BLUE': (0, 9)}
+FINISH_SPRITE = CELL // 2
+# Finished tokens sit in the centre square (7, 7), each colour in its own half-size slot, clear of the home paths.
+FINISH_OFFSETS = {
+    'RED': (7 * CELL, 7 * CELL + CELL // 4), 'GREEN': (7 * CELL + CELL // 4, 7 * CELL),
+    'YELLOW': (7 * CELL + CELL // 2, 7 * CELL + CELL // 4), 'BLUE': (7 * CELL + CELL // 4, 7 * CELL + CELL // 2),
+}
+
+def _track_cells() -> List[Tuple[int, int]]:
+    """Grid cells (col, row) of the 52 main-track squares, starting at RED's start square."""
+    cells = [(c, 6) for c in range(1, 6)] + [(6, r) for r in range(5, -1, -1)] + [(7, 0), (8, 0)]
+    cells += [(8, r) for r in range(1, 6)] + [(c, 6) for c in range(9, 15)] + [(14, 7), (14, 8)]
+    cells += [(c, 8) for c in range(13, 8, -1)] + [(8, r) for r in range(9, 15)] + [(7, 14), (6, 14)]
+    cells += [(6, r) for r in range(13, 8, -1)] + [(c, 8) for c in range(5, -1, -1)] + [(0, 7), (0, 6)]
+    return cells
+
+TRACK_CELLS = _track_cells()
+HOME_PATH_CELLS = {
+    'RED': [(c, 7) for c in range(1, 7)],
+    'GREEN': [(7, r) for r in range(1, 7)],
+    'YELLOW': [(c, 7) for c in range(13, 7, -1)],
+    'BLUE': [(7, r) for r in range(13, 7, -1)],
+}
+
+class LRUCache:
+    """An LRU mapping bounded by item count and, optionally, by the total size of bytes values."""
+
+    def __init__(self, max_items: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._data: 'OrderedDict[str, Any]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key: str, value: Any):
+        if key in self._data:
+            self.size_bytes -= self._sizeof(self._data.pop(key))
+        self._data[key] = value
+        self.size_bytes += self._sizeof(value)
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_bytes is not None and self.size_bytes > self.max_bytes)
+        ):
+            _, evicted = self._data.popitem(last=False)
+            self.size_bytes -= self._sizeof(evicted)
+
+    def pop(self, key: str):
+        if key in self._data:
+            self.size_bytes -= self._sizeof(self._data.pop(key))
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        return len(value) if isinstance(value, (bytes, bytearray)) else 0
+
+_png_cache = LRUCache(max_bytes=PNG_CACHE_MAX_BYTES)
+_file_id_cache = LRUCache(max_items=FILE_ID_CACHE_MAX_ITEMS)
+_atlas: Dict[Any, 'Image.Image'] = {}
+
+def is_available() -> bool:
+    """Whether image boards can be rendered in this environment."""
+    return Image is not None
+
+def position_key(game_state: Dict[str, Any]) -> str:
+    """Content address of a board image: a hash of every colour's (unordered) token positions."""
+    parts = sorted(
+        f"{pdata['color']}:{','.join(map(str, sorted(pdata['tokens'])))}"
+        for pdata in game_state['players'].values()
+    )
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+def _cell_box(col: int, row: int, inset: int = 0) -> Tuple[int, int, int, int]:
+    return (col * CELL + inset, row * CELL + inset, (col + 1) * CELL - inset, (row + 1) * CELL - inset)
+
+def _base_board() -> 'Image.Image':
+    """Rasterizes the empty board once; every render starts from a copy of it."""
+    if 'base' in _atlas:
+        return _atlas['base']
+    board = Image.new('RGB', (BOARD_PX, BOARD_PX), 'white')
+    draw = ImageDraw.Draw(board)
+    for color, (col, row) in YARD_CORNERS.items():
+        draw.rectangle((col * CELL, row * CELL, (col + 6) * CELL - 1, (row + 6) * CELL - 1), fill=COLORS[color])
+        draw.rectangle(((col + 1) * CELL, (row + 1) * CELL, (col + 5) * CELL - 1, (row + 5) * CELL - 1), fill='white')
+    for index, (col, row) in enumerate(TRACK_CELLS):
+        fill = 'white'
+        for color, start in LudoGame.PLAYER_STARTS.items():
+            if index == start:
+                fill = COLORS[color]
+        draw.rectangle(_cell_box(col, row), fill=fill, outline='black')
+        if index in LudoGame.SAFE_ZONES:
+            x0, y0, x1, y1 = _cell_box(col, row, inset=12)
+            draw.ellipse((x0, y0, x1, y1), outline='black', width=2)
+    center = (7.5 * CELL, 7.5 * CELL)
+    corners = {'RED': ((6, 6), (6, 9)), 'GREEN': ((6, 6), (9, 6)), 'YELLOW': ((9, 6), (9, 9)), 'BLUE': ((6, 9), (9, 9))}
+    for color, ((ax, ay), (bx, by)) in corners.items():
+        draw.polygon([(ax * CELL, ay * CELL), (bx * CELL, by * CELL), center], fill=COLORS[color], outline='black')
+    # All six home-path squares, the last one overlapping the finish triangle's outer edge.
+    for color, cells in HOME_PATH_CELLS.items():
+        for col, row in cells:
+            draw.rectangle(_cell_box(col, row), fill=COLORS[color], outline='black')
+    draw.rectangle(_cell_box(7, 7), fill='white', outline='black')
+    _atlas['base'] = board
+    return board
+
+def _sprite(color: str, count: int, size: int = CELL) -> 'Image.Image':
+    """Returns the token sprite for `count` stacked tokens of `color`, rasterizing it on first use."""
+    key = (color, count, size)
+    if key not in _atlas:
+        sprite = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        inset = max(size // 7, 1)
+        draw.ellipse((inset, inset, size - inset, size - inset), fill=COLORS[color] + (255,), outline=(0, 0, 0, 255), width=2)
+        if count > 1:
+            draw.text((size // 2 - 3, size // 2 - 6), str(count), fill=(0, 0, 0, 255))
+        _atlas[key] = sprite
+    return _atlas[key]
+
+def _token_layers(game_state: Dict[str, Any]) -> List[Tuple[str, int, Tuple[int, int], int]]:
+    """Lists (color, count, pixel offset, sprite size) for every sprite that has to be pasted."""
+    layers = []
+    track: Dict[int, List[Tuple[str, int]]] = {}
+    for pdata in game_state['players'].values():
+        color = pdata['color']
+        counts: Dict[int, int] = {}
+        for pos in pdata['tokens']:
+            counts[pos] = counts.get(pos, 0) + 1
+        for pos, count in counts.items():
+            if pos == -1:
+                yard_col, yard_row = YARD_CORNERS[color]
+                for slot in range(count):
+                    col, row = yard_col + 1.5 + 2 * (slot % 2), yard_row + 1.5 + 2 * (slot // 2)
+                    layers.append((color, 1, (int(col * CELL), int(row * CELL)), CELL))
+            elif pos == 107:
+                layers.append((color, count, FINISH_OFFSETS[color], FINISH_SPRITE))
+            elif pos >= 101:
+                col, row = HOME_PATH_CELLS[color][pos - 101]
+                layers.append((color, count, (col * CELL, row * CELL), CELL))
+            elif 0 <= pos < LudoGame.BOARD_SIZE:
+                track.setdefault(pos, []).append((color, count))
+    for pos, occupants in track.items():
+        col, row = TRACK_CELLS[pos]
+        for i, (color, count) in enumerate(occupants):
+            shift = (i - (len(occupants) - 1) / 2) * 10 # Side by side when colours share a safe square
+            layers.append((color, count, (int(col * CELL + shift), row * CELL), CELL))
+    return layers
+
+def render_board_image(game_state: Dict[str, Any]) -> bytes:
+    """Returns the board as PNG bytes, composed from cached layers and memoized by position hash."""
+    key = position_key(game_state)
+    png = _png_cache.get(key)
+    if png is not None:
+        return png
+    board = _base_board().copy()
+    for color, count, offset, size in _token_layers(game_state):
+        sprite = _sprite(color, count, size)
+        board.paste(sprite, offset, sprite)
+    buffer = io.BytesIO()
+    board.save(buffer, format='PNG', optimize=True)
+    png = buffer.getvalue()
+    _png_cache.put(key, png)
+    return png
+
+def board_media(game_state: Dict[str, Any]) -> Tuple[str, Any]:
+    """Returns (position key, media), where media is a stored Telegram file_id or fresh PNG bytes."""
+    key = position_key(game_state)
+    file_id = _file_id_cache.get(key)
+    if file_id is not None:
+        return key, file_id
+    return key, render_board_image(game_state)
+
+def remember_file_id(key: str, file_id: str):
+    """Stores the file_id Telegram assigned to an uploaded board; the PNG is no longer needed."""
+    _file_id_cache.put(key, file_id)
+    _png_cache.pop(key)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from telegram.ext import Application
+
+from db.manager import run_storage_maintenance, get_top_players
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MAINTENANCE_INTERVAL_SECONDS = 15 * 60
+LEADERBOARD_REFRESH_INTERVAL_SECONDS = 60
+LEADERBOARD_SIZE = 10
+
+async def storage_maintenance_loop(application: Application):
+    """Periodically partitions, archives and prunes the games table."""
+    while True:
+        try:
+            result = await run_storage_maintenance(application.bot_data['pool'])
+            logger.info("Storage maintenance: %s", result)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Storage maintenance failed")
+        await asyncio.sleep(STORAGE_MAINTENANCE_INTERVAL_SECONDS)
+
+async def refresh_leaderboard(application: Application):
+    """Reloads the cached top-N ranking from `user_stats`."""
+    entries = await get_top_players(application.bot_data['pool'], LEADERBOARD_SIZE)
+    application.bot_data['leaderboard'] = {'entries': entries, 'refreshed_at': datetime.now(timezone.utc)}
+
+async def leaderboard_refresh_loop(application: Application):
+    """Keeps the cached leaderboard at most one interval stale."""
+    while True:
+        try:
+            await refresh_leaderboard(application)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+        await asyncio.sleep(LEADERBOARD_REFRESH_INTERVAL_SECONDS)
+
+def start_background_jobs(application: Application):
+    """Schedules the recurring maintenance jobs and keeps their tasks for shutdown."""
+    application.bot_data['background_tasks'] = [
+        asyncio.create_task(storage_maintenance_loop(application)),
+        asyncio.create_task(leaderboard_refresh_loop(application)),
+    ]
+
+async def stop_background_jobs(application: Application):
+    """Cancels the recurring maintenance jobs."""
+    tasks = application.bot_data.pop('background_tasks', [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
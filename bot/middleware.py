@@ -0,0 +1,111 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+RATE_LIMIT_BURST = 8            # updates a user may send back-to-back
+RATE_LIMIT_PER_SECOND = 2.0     # sustained updates per user
+DEDUP_WINDOW_SECONDS = 120      # Telegram redeliveries arrive well within this
+DEDUP_MAX_ENTRIES = 100_000
+TOMBSTONE_TTL_SECONDS = 6 * 3600
+TOMBSTONE_MAX_ENTRIES = 100_000
+TRACKED_USERS_MAX = 50_000
+
+GAME_CALLBACK_PATTERN = re.compile(r"^(?:join_game|roll_dice|move_token)_(\d+)")
+
+class TimeWindowSet:
+    """A set whose members expire after `ttl` seconds, holding at most `max_entries` of the newest."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._expiry: 'OrderedDict[object, float]' = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        expiry = self._expiry.get(key)
+        return expiry is not None and expiry > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, key: object):
+        now = time.monotonic()
+        self._expiry.pop(key, None)
+        self._expiry[key] = now + self.ttl
+        # Entries are kept in insertion order, so expired ones are always at the front.
+        while self._expiry and (len(self._expiry) > self.max_entries or next(iter(self._expiry.values())) <= now):
+            self._expiry.popitem(last=False)
+
+    def discard(self, key: object):
+        self._expiry.pop(key, None)
+
+class TokenBuckets:
+    """Per-user token buckets; the least recently active users are forgotten past `max_users`."""
+
+    def __init__(self, burst: float, rate: float, max_users: int):
+        self.burst = burst
+        self.rate = rate
+        self.max_users = max_users
+        self._buckets: 'OrderedDict[int, list]' = OrderedDict()
+
+    def allow(self, user_id: int) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.pop(user_id, None)
+        if bucket is None:
+            bucket = [self.burst, now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        allowed = tokens >= 1
+        self._buckets[user_id] = [tokens - 1 if allowed else tokens, now]
+        if len(self._buckets) > self.max_users:
+            self._buckets.popitem(last=False)
+        return allowed
+
+class UpdateGuard:
+    """In-memory filters applied to every update before any handler touches the database."""
+
+    def __init__(self):
+        self.buckets = TokenBuckets(RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND, TRACKED_USERS_MAX)
+        self.seen_updates = TimeWindowSet(DEDUP_WINDOW_SECONDS, DEDUP_MAX_ENTRIES)
+        self.seen_callbacks = TimeWindowSet(DEDUP_WINDOW_SECONDS, DEDUP_MAX_ENTRIES)
+        self.closed_games = TimeWindowSet(TOMBSTONE_TTL_SECONDS, TOMBSTONE_MAX_ENTRIES)
+
+    def close_game(self, game_id: int):
+        """Tombstones a finished or unknown game so its buttons are rejected without a DB lookup."""
+        self.closed_games.add(game_id)
+
+def _game_id_of(callback_data: Optional[str]) -> Optional[int]:
+    match = GAME_CALLBACK_PATTERN.match(callback_data or "")
+    return int(match.group(1)) if match else None
+
+async def guard_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Drops duplicate, rate-limited and dead-game updates by raising ApplicationHandlerStop."""
+    guard: UpdateGuard = context.bot_data['update_guard']
+
+    if update.update_id in guard.seen_updates:
+        raise ApplicationHandlerStop
+    guard.seen_updates.add(update.update_id)
+
+    query = update.callback_query
+    if query:
+        if query.id in guard.seen_callbacks:
+            raise ApplicationHandlerStop
+        guard.seen_callbacks.add(query.id)
+
+    user = update.effective_user
+    if user and not guard.buckets.allow(user.id):
+        if query:
+            await query.answer("Too many requests. Please slow down.")
+        raise ApplicationHandlerStop
+
+    if query and _game_id_of(query.data) in guard.closed_games:
+        await query.answer("Game not available.", show_alert=True)
+        raise ApplicationHandlerStop
+
+def close_game(context: ContextTypes.DEFAULT_TYPE, game_id: int):
+    """Records that a game no longer accepts button presses."""
+    guard = context.bot_data.get('update_guard')
+    if guard:
+        guard.close_game(game_id)
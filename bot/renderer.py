@@ -1,9 +1,10 @@
 from typing import Dict, Any
 from bot.game_logic import LudoGame
 
+PLAYER_ICONS = {'RED': '🔴', 'GREEN': '🟢', 'YELLOW': '🟡', 'BLUE': '🔵'}
+
 def render_board(game_state: Dict[str, Any]) -> str:
     """Generates an emoji-based representation of the Ludo board."""
-    PLAYER_ICONS = {'RED': '🔴', 'GREEN': '🟢', 'YELLOW': '🟡', 'BLUE': '🔵'}
     PATH_ICON = '⬜'
     SAFE_ICON = '⭐'
     
@@ -30,7 +31,15 @@ def render_board(game_state: Dict[str, Any]) -> str:
             
     # Simple linear representation for robustness in Telegram
     board_str = ' '.join(board)
-    
+    info_str, status_text = _info_text(game_state), _status_text(game_state)
+
+    return f"{info_str}\n\n`{board_str}`\n\n{status_text}"
+
+def render_caption(game_state: Dict[str, Any]) -> str:
+    """Generates the player summary and status text shown under an image board."""
+    return f"{_info_text(game_state)}\n\n{_status_text(game_state)}"
+
+def _info_text(game_state: Dict[str, Any]) -> str:
     info_lines = []
     for pid in game_state['player_order']:
         pdata = game_state['players'][pid]
@@ -39,8 +48,9 @@ def render_board(game_state: Dict[str, Any]) -> str:
         tokens_yard = sum(1 for t in pdata['tokens'] if t == -1)
         info_lines.append(f"{icon} {pdata['username']}: 🏆x{tokens_home}, 🏠x{tokens_yard}")
 
-    info_str = "\n".join(info_lines)
-    
+    return "\n".join(info_lines)
+
+def _status_text(game_state: Dict[str, Any]) -> str:
     current_player_id = game_state['player_order'][game_state['turn_index']]
     current_player_data = game_state['players'][current_player_id]
     current_player_icon = PLAYER_ICONS[current_player_data['color']]
@@ -60,4 +70,9 @@ def render_board(game_state: Dict[str, Any]) -> str:
         winner_data = game_state['players'][winner_id]
         status_text = f"Game Forfeited. {PLAYER_ICONS[winner_data['color']]}{winner_data['username']} wins!"
 
-    return f"{info_str}\n\n`{board_str}`\n\n{status_text}"
\ No newline at end of file
+    if game_state['status'] == 'active' and 'rng' in game_state:
+        status_text += f"\nDice seed hash: {game_state['rng']['seed_hash']}"
+    elif game_state['status'] in ('finished', 'forfeited') and 'rng' in game_state:
+        status_text += f"\nDice seed: {game_state['rng']['seed']}"
+
+    return status_text
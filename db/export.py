@@ -0,0 +1,218 @@
+import asyncio
+import csv
+import gzip
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+import asyncpg
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet output is optional; CSV.gz is always available.
+    pa = pq = None
+
+from core.config import settings
+from db.manager import create_db_pool
+
+EXPORT_LAG = timedelta(minutes=5)  # rows younger than this may still have uncommitted predecessors
+EXPORT_PREFETCH = 1000             # rows per server-side cursor round trip
+EXPORT_BATCH_ROWS = 10_000         # rows per Parquet row group
+
+# Each stream is read in (ts, key) order from its watermark onwards. Columns are (name, kind).
+STREAMS: Dict[str, Dict[str, Any]] = {
+    'games': {
+        'table': 'games_archive', 'ts': 'archived_at', 'key': 'game_id', 'key_type': 'int',
+        'columns': [
+            ('game_id', 'int'), ('status', 'text'), ('winner_id', 'int'), ('player_ids', 'int_list'),
+            ('stake', 'decimal'), ('pot', 'decimal'), ('created_at', 'timestamp'),
+            ('finished_at', 'timestamp'), ('archived_at', 'timestamp'),
+        ],
+    },
+    'transactions': {
+        'table': 'transactions', 'ts': 'settled_at', 'key': 'tx_ref', 'key_type': 'text',
+        'columns': [
+            ('tx_ref', 'text'), ('telegram_id', 'int'), ('amount', 'decimal'), ('status', 'text'),
+            ('created_at', 'timestamp'), ('settled_at', 'timestamp'),
+        ],
+    },
+    'withdrawals': {
+        'table': 'withdrawals', 'ts': 'settled_at', 'key': 'withdrawal_id', 'key_type': 'int',
+        'columns': [
+            ('withdrawal_id', 'int'), ('telegram_id', 'int'), ('amount', 'decimal'), ('status', 'text'),
+            ('created_at', 'timestamp'), ('settled_at', 'timestamp'),
+        ],
+    },
+}
+
+ROLLUP_COLUMNS = ['games_count', 'commission_total', 'deposit_count', 'deposit_volume', 'withdrawal_count', 'withdrawal_volume']
+
+def _rollup_delta(stream: str, row: asyncpg.Record) -> Optional[tuple]:
+    """Returns (day, {metric: increment}) for rows that count towards the daily rollups."""
+    if stream == 'games' and row['status'] in ('finished', 'forfeited'):
+        commission = row['pot'] * Decimal(str(settings.OWNER_COMMISSION_RATE))
+        return row['finished_at'].date(), {'games_count': 1, 'commission_total': commission}
+    if stream == 'transactions' and row['status'] == 'success':
+        return row['settled_at'].date(), {'deposit_count': 1, 'deposit_volume': row['amount']}
+    if stream == 'withdrawals' and row['status'] == 'processed':
+        return row['settled_at'].date(), {'withdrawal_count': 1, 'withdrawal_volume': row['amount']}
+    return None
+
+class _CsvGzSink:
+    def __init__(self, path: str, columns: List[tuple]):
+        self.file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+        self.columns = columns
+
+    def write(self, row: asyncpg.Record):
+        self.writer.writerow([
+            ';'.join(map(str, row[name])) if kind == 'int_list' and row[name] is not None
+            else row[name].isoformat() if kind == 'timestamp' and row[name] is not None
+            else row[name]
+            for name, kind in self.columns
+        ])
+
+    def close(self):
+        self.file.close()
+
+class _ParquetSink:
+    TYPES = {
+        'int': lambda: pa.int64(), 'text': lambda: pa.string(), 'decimal': lambda: pa.decimal128(14, 2),
+        'timestamp': lambda: pa.timestamp('us', tz='UTC'), 'int_list': lambda: pa.list_(pa.int64()),
+    }
+
+    def __init__(self, path: str, columns: List[tuple]):
+        self.schema = pa.schema([(name, self.TYPES[kind]()) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        self.columns = columns
+        self.batch: List[dict] = []
+
+    def write(self, row: asyncpg.Record):
+        self.batch.append({name: row[name] for name, _ in self.columns})
+        if len(self.batch) >= EXPORT_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self.batch:
+            self.writer.write_table(pa.Table.from_pylist(self.batch, schema=self.schema))
+            self.batch = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+async def _get_watermark(conn: asyncpg.Connection, stream: str) -> tuple:
+    record = await conn.fetchrow("SELECT last_ts, last_key FROM export_watermarks WHERE stream = $1", stream)
+    is_int = STREAMS[stream]['key_type'] == 'int'
+    if not record:
+        return datetime(1970, 1, 1, tzinfo=timezone.utc), 0 if is_int else ''
+    return record['last_ts'], int(record['last_key']) if is_int else record['last_key']
+
+async def export_stream(pool: asyncpg.Pool, stream: str, output_dir: str, fmt: str = 'csv') -> int:
+    """Streams rows past the watermark of `stream` into one compressed file and folds them into `daily_rollups`.
+
+    Memory stays constant: rows arrive through a server-side cursor and go straight to the file,
+    and the only accumulated state is one rollup entry per calendar day touched.
+    Returns 0 without exporting if another run currently holds the stream.
+    """
+    async with pool.acquire() as conn:
+        # Overlapping runs would start from the same watermark and count the same rows twice.
+        if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", f"export:{stream}"):
+            return 0
+        try:
+            return await _export_locked_stream(conn, stream, output_dir, fmt)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", f"export:{stream}")
+
+async def _export_locked_stream(conn: asyncpg.Connection, stream: str, output_dir: str, fmt: str) -> int:
+    spec = STREAMS[stream]
+    last_ts, last_key = await _get_watermark(conn, stream)
+    upper_ts = datetime.now(timezone.utc) - EXPORT_LAG
+    columns = ', '.join(name for name, _ in spec['columns'])
+    query = f"""
+        SELECT {columns} FROM {spec['table']}
+        WHERE ({spec['ts']}, {spec['key']}) > ($1, $2::{spec['key_type']}) AND {spec['ts']} < $3
+        ORDER BY {spec['ts']}, {spec['key']}
+    """
+
+    os.makedirs(os.path.join(output_dir, stream), exist_ok=True)
+    suffix = 'parquet' if fmt == 'parquet' else 'csv.gz'
+    path = os.path.join(output_dir, stream, f"{stream}-{upper_ts:%Y%m%dT%H%M%S}.{suffix}")
+    tmp_path = path + '.tmp'
+    sink = _ParquetSink(tmp_path, spec['columns']) if fmt == 'parquet' else _CsvGzSink(tmp_path, spec['columns'])
+
+    rollups: Dict[date, Dict[str, Any]] = {}
+    count, last_row = 0, None
+    try:
+        async with conn.transaction(isolation='repeatable_read', readonly=True):
+            async for row in conn.cursor(query, last_ts, last_key, upper_ts, prefetch=EXPORT_PREFETCH):
+                sink.write(row)
+                delta = _rollup_delta(stream, row)
+                if delta:
+                    day, increments = delta
+                    totals = rollups.setdefault(day, dict.fromkeys(ROLLUP_COLUMNS, 0))
+                    for metric, value in increments.items():
+                        totals[metric] += value
+                count, last_row = count + 1, row
+    finally:
+        sink.close()
+
+    if not count:
+        os.remove(tmp_path)
+        return 0
+    os.replace(tmp_path, path)
+
+    # Rollups and the watermark advance together, so a crash re-exports a file but never double-counts.
+    async with conn.transaction():
+        await conn.executemany(
+            f"""
+            INSERT INTO daily_rollups (day, {', '.join(ROLLUP_COLUMNS)}) VALUES ($1, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (day) DO UPDATE SET
+                {', '.join(f"{c} = daily_rollups.{c} + EXCLUDED.{c}" for c in ROLLUP_COLUMNS)}
+            """,
+            [(day, *(totals[c] for c in ROLLUP_COLUMNS)) for day, totals in rollups.items()]
+        )
+        await conn.execute(
+            """
+            INSERT INTO export_watermarks (stream, last_ts, last_key) VALUES ($1, $2, $3)
+            ON CONFLICT (stream) DO UPDATE SET last_ts = EXCLUDED.last_ts, last_key = EXCLUDED.last_key
+            """,
+            stream, last_row[spec['ts']], str(last_row[spec['key']])
+        )
+    return count
+
+async def export_daily_rollups(pool: asyncpg.Pool, output_dir: str):
+    """Rewrites `daily_rollups.csv`, which is one small row per day."""
+    path = os.path.join(output_dir, 'daily_rollups.csv')
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            with open(path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['day', *ROLLUP_COLUMNS])
+                async for row in conn.cursor(f"SELECT day, {', '.join(ROLLUP_COLUMNS)} FROM daily_rollups ORDER BY day"):
+                    writer.writerow(list(row.values()))
+    os.replace(path + '.tmp', path)
+
+async def run_export(output_dir: str, fmt: Optional[str] = None) -> Dict[str, int]:
+    """Exports every stream incrementally. Uses Parquet when pyarrow is installed unless `fmt` says otherwise."""
+    fmt = fmt or ('parquet' if pq is not None else 'csv')
+    if fmt == 'parquet' and pq is None:
+        raise ValueError("Parquet export requires pyarrow.")
+    pool = await create_db_pool()
+    try:
+        exported = {stream: await export_stream(pool, stream, output_dir, fmt) for stream in STREAMS}
+        await export_daily_rollups(pool, output_dir)
+    finally:
+        await pool.close()
+    return exported
+
+if __name__ == "__main__":
+    # Usage: python -m db.export <output_dir> [csv|parquet]
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else 'exports'
+    results = asyncio.run(run_export(output_dir, sys.argv[2] if len(sys.argv) > 2 else None))
+    for stream, count in results.items():
+        print(f"{stream}: {count} rows")
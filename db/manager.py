@@ -1,10 +1,22 @@
 import asyncpg
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 import json
+import zlib
 from typing import Optional, Dict, Any, List
 
 from core.config import settings
 
+# --- Storage Policy ---
+PARTITION_DAYS_AHEAD = 2        # daily partitions are created this far in advance
+HOT_WINDOW = timedelta(days=1)  # lobby/active games never live longer than this
+LOBBY_TTL = timedelta(hours=1)  # unjoined lobbies are expired after this
+MAX_GAME_AGE = HOT_WINDOW - timedelta(hours=2)  # older active games are refunded; the margin outlasts a maintenance interval
+STALE_ACTIVE_AFTER = timedelta(minutes=10)  # active games idle this long lost their timeout task and are refunded
+ARCHIVE_AFTER = timedelta(hours=1)  # finished games stay hot this long before archival
+PARTITION_RETENTION_DAYS = 7    # emptied daily partitions older than this are dropped
+ARCHIVE_BATCH_SIZE = 500
+
 # --- Schema Setup ---
 async def create_db_pool():
     """Creates a connection pool to the PostgreSQL database."""
@@ -20,24 +32,49 @@ async def setup_database(pool: asyncpg.Pool):
                 balance DECIMAL(10, 2) NOT NULL DEFAULT 0.00
             );
         """)
+        await _migrate_unpartitioned_games(connection)
         await connection.execute("""
             CREATE TABLE IF NOT EXISTS games (
-                game_id SERIAL PRIMARY KEY,
+                game_id SERIAL,
                 game_state JSONB NOT NULL,
-                status TEXT NOT NULL, -- 'lobby', 'active', 'finished', 'forfeited'
+                status TEXT NOT NULL, -- 'lobby', 'active', 'finished', 'forfeited', 'expired', 'refunded'
                 created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                last_action_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                last_action_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (game_id, created_at)
+            ) PARTITION BY RANGE (created_at);
+        """)
+        await connection.execute("CREATE INDEX IF NOT EXISTS games_status_idx ON games (status, last_action_at);")
+        await connection.execute("CREATE TABLE IF NOT EXISTS games_default PARTITION OF games DEFAULT;")
+        await ensure_partitions(connection, 'games')
+        await connection.execute("""
+            CREATE TABLE IF NOT EXISTS games_archive (
+                game_id INTEGER PRIMARY KEY,
+                status TEXT NOT NULL, -- 'finished', 'forfeited', 'expired', 'refunded'
+                winner_id BIGINT,
+                player_ids BIGINT[] NOT NULL,
+                stake DECIMAL(10, 2) NOT NULL,
+                pot DECIMAL(10, 2) NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL,
+                finished_at TIMESTAMPTZ NOT NULL,
+                archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                state_z BYTEA NOT NULL -- zlib-compressed game_state JSON
             );
         """)
+        await connection.execute("ALTER TABLE games_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW();")
+        await connection.execute("CREATE INDEX IF NOT EXISTS games_archive_export_idx ON games_archive (archived_at, game_id);")
         await connection.execute("""
             CREATE TABLE IF NOT EXISTS transactions (
                 tx_ref TEXT PRIMARY KEY,
                 telegram_id BIGINT NOT NULL,
                 amount DECIMAL(10, 2) NOT NULL,
                 status TEXT NOT NULL, -- 'pending', 'success', 'failed'
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                settled_at TIMESTAMPTZ -- set by the stamp_settled_at trigger when the status leaves 'pending'
             );
         """)
+        await connection.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS settled_at TIMESTAMPTZ;")
+        await connection.execute("UPDATE transactions SET settled_at = created_at WHERE settled_at IS NULL AND status <> 'pending';")
+        await connection.execute("CREATE INDEX IF NOT EXISTS transactions_export_idx ON transactions (settled_at, tx_ref) WHERE settled_at IS NOT NULL;")
         await connection.execute("""
             CREATE TABLE IF NOT EXISTS withdrawals (
                 withdrawal_id SERIAL PRIMARY KEY,
@@ -45,10 +82,133 @@ async def setup_database(pool: asyncpg.Pool):
                 amount DECIMAL(10, 2) NOT NULL,
                 account_details TEXT NOT NULL,
                 status TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'processed', 'failed'
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                settled_at TIMESTAMPTZ -- set by the stamp_settled_at trigger when the status leaves 'pending'
+            );
+        """)
+        await connection.execute("ALTER TABLE withdrawals ADD COLUMN IF NOT EXISTS settled_at TIMESTAMPTZ;")
+        await connection.execute("UPDATE withdrawals SET settled_at = created_at WHERE settled_at IS NULL AND status <> 'pending';")
+        await connection.execute("CREATE INDEX IF NOT EXISTS withdrawals_export_idx ON withdrawals (settled_at, withdrawal_id) WHERE settled_at IS NOT NULL;")
+        # Status changes made outside the bot (admin panel, manual SQL) must move rows past the export watermark too.
+        await connection.execute("""
+            CREATE OR REPLACE FUNCTION stamp_settled_at() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' OR NEW.status IS DISTINCT FROM OLD.status THEN
+                    NEW.settled_at := CASE WHEN NEW.status = 'pending' THEN NULL ELSE NOW() END;
+                ELSE
+                    NEW.settled_at := OLD.settled_at;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        for table in ('transactions', 'withdrawals'):
+            async with connection.transaction():
+                await connection.execute(f"DROP TRIGGER IF EXISTS {table}_settled_at ON {table};")
+                await connection.execute(
+                    f"CREATE TRIGGER {table}_settled_at BEFORE INSERT OR UPDATE OF status ON {table} "
+                    f"FOR EACH ROW EXECUTE FUNCTION stamp_settled_at();"
+                )
+        await connection.execute("""
+            CREATE TABLE IF NOT EXISTS user_stats (
+                telegram_id BIGINT PRIMARY KEY,
+                games_played INTEGER NOT NULL DEFAULT 0,
+                games_won INTEGER NOT NULL DEFAULT 0,
+                total_staked DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+                net_winnings DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+                current_streak INTEGER NOT NULL DEFAULT 0, -- consecutive wins, reset by a loss
+                best_streak INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+        """)
+        await connection.execute("CREATE INDEX IF NOT EXISTS user_stats_ranking_idx ON user_stats (net_winnings DESC, games_won DESC);")
+        await connection.execute("""
+            CREATE TABLE IF NOT EXISTS export_watermarks (
+                stream TEXT PRIMARY KEY,
+                last_ts TIMESTAMPTZ NOT NULL,
+                last_key TEXT NOT NULL -- key of the last exported row, compared after casting to the stream's key type
+            );
+        """)
+        await connection.execute("""
+            CREATE TABLE IF NOT EXISTS daily_rollups (
+                day DATE PRIMARY KEY,
+                games_count INTEGER NOT NULL DEFAULT 0,
+                commission_total DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+                deposit_count INTEGER NOT NULL DEFAULT 0,
+                deposit_volume DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+                withdrawal_count INTEGER NOT NULL DEFAULT 0,
+                withdrawal_volume DECIMAL(14, 2) NOT NULL DEFAULT 0.00
             );
         """)
 
+async def _migrate_unpartitioned_games(connection: asyncpg.Connection):
+    """Converts a pre-partitioning `games` table into the partitioned layout, keeping all rows."""
+    relkind = await connection.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass('games')")
+    if relkind != 'r':
+        return
+    async with connection.transaction():
+        await connection.execute("ALTER TABLE games RENAME TO games_legacy;")
+        await connection.execute("ALTER SEQUENCE IF EXISTS games_game_id_seq RENAME TO games_legacy_game_id_seq;")
+        await connection.execute("""
+            CREATE TABLE games (
+                game_id SERIAL,
+                game_state JSONB NOT NULL,
+                status TEXT NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                last_action_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (game_id, created_at)
+            ) PARTITION BY RANGE (created_at);
+        """)
+        await connection.execute("CREATE TABLE games_default PARTITION OF games DEFAULT;")
+        # Daily partitions must exist before the copy: Postgres refuses to create a partition
+        # for a range the default partition already holds rows in.
+        oldest = await connection.fetchval("SELECT MIN(created_at) FROM games_legacy")
+        await ensure_partitions(connection, 'games', since=oldest.astimezone(timezone.utc).date() if oldest else None)
+        await connection.execute("INSERT INTO games SELECT game_id, game_state, status, created_at, last_action_at FROM games_legacy;")
+        await connection.execute("SELECT setval('games_game_id_seq', GREATEST((SELECT MAX(game_id) FROM games), 1));")
+        await connection.execute("DROP TABLE games_legacy;")
+
+def _partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+async def ensure_partitions(connection: asyncpg.Connection, table: str, days_ahead: int = PARTITION_DAYS_AHEAD, since: Optional[date] = None):
+    """Creates the daily `created_at` partitions of `table` from `since` (default today) up to `days_ahead` days out.
+
+    Works for any table declared with `PARTITION BY RANGE (created_at)`.
+    """
+    today = datetime.now(timezone.utc).date()
+    first = min(since, today) if since else today
+    for offset in range((today - first).days + days_ahead + 1):
+        day = first + timedelta(days=offset)
+        await connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(table, day)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00');"
+        )
+
+async def drop_expired_partitions(connection: asyncpg.Connection, table: str, retention_days: int = PARTITION_RETENTION_DAYS) -> List[str]:
+    """Detaches and drops empty daily partitions of `table` older than `retention_days`."""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    children = await connection.fetch(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass($1) AND c.relname LIKE $2",
+        table, f"{table}_p%"
+    )
+    dropped = []
+    for child in children:
+        name = child['relname']
+        try:
+            day = datetime.strptime(name[len(table) + 2:], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if day >= cutoff:
+            continue
+        if await connection.fetchval(f"SELECT EXISTS (SELECT 1 FROM {name})"):
+            continue
+        await connection.execute(f"ALTER TABLE {table} DETACH PARTITION {name};")
+        await connection.execute(f"DROP TABLE {name};")
+        dropped.append(name)
+    return dropped
+
 # --- User Management ---
 async def get_or_create_user(pool: asyncpg.Pool, telegram_id: int, username: str) -> Dict[str, Any]:
     """Retrieves a user or creates one if they don't exist."""
@@ -86,8 +246,11 @@ async def get_transaction(pool: asyncpg.Pool, tx_ref: str) -> Optional[Dict[str,
     return dict(record) if record else None
 
 async def update_transaction_status(pool: asyncpg.Pool, tx_ref: str, status: str):
-    """Updates the status of a transaction."""
-    await pool.execute("UPDATE transactions SET status = $1 WHERE tx_ref = $2", status, tx_ref)
+    """Updates the status of a transaction. The `stamp_settled_at` trigger maintains `settled_at`."""
+    await pool.execute(
+        "UPDATE transactions SET status = $1 WHERE tx_ref = $2 AND status IS DISTINCT FROM $1",
+        status, tx_ref
+    )
 
 # --- Game Management ---
 async def create_game(pool: asyncpg.Pool, initial_state: Dict[str, Any]) -> int:
@@ -99,20 +262,220 @@ async def create_game(pool: asyncpg.Pool, initial_state: Dict[str, Any]) -> int:
     return game_id
 
 async def get_game(pool: asyncpg.Pool, game_id: int) -> Optional[Dict[str, Any]]:
-    """Retrieves a game by its ID."""
+    """Retrieves a game by its ID, falling back to the archive for compacted games."""
     record = await pool.fetchrow("SELECT * FROM games WHERE game_id = $1", game_id)
     if record:
         game_data = dict(record)
         game_data['game_state'] = json.loads(game_data['game_state'])
         return game_data
+    record = await pool.fetchrow(
+        "SELECT game_id, status, created_at, finished_at AS last_action_at, state_z FROM games_archive WHERE game_id = $1",
+        game_id
+    )
+    if record:
+        game_data = dict(record)
+        game_data['game_state'] = json.loads(zlib.decompress(game_data.pop('state_z')))
+        return game_data
     return None
 
-async def update_game(pool: asyncpg.Pool, game_id: int, new_state: Dict[str, Any], status: str):
-    """Updates a game's state and status."""
+async def get_active_game(pool: asyncpg.Pool, game_id: int) -> Optional[Dict[str, Any]]:
+    """Retrieves a lobby or active game, touching only the hot partitions.
+
+    Open games never reach HOT_WINDOW: the maintenance job expires lobbies after LOBBY_TTL
+    and refunds active games older than MAX_GAME_AGE, so bounding `created_at` lets Postgres
+    prune every older partition.
+    """
+    record = await pool.fetchrow(
+        "SELECT * FROM games WHERE game_id = $1 AND created_at >= $2 AND status IN ('lobby', 'active')",
+        game_id, datetime.now(timezone.utc) - HOT_WINDOW
+    )
+    if record:
+        game_data = dict(record)
+        game_data['game_state'] = json.loads(game_data['game_state'])
+        return game_data
+    return None
+
+# Callbacks write back a whole state read earlier; message bookkeeping stored by set_game_message
+# in the meantime must survive that write, so once the board image is posted the stored fields win.
+_STATE_WITH_STORED_MESSAGE = (
+    "$1::jsonb || CASE WHEN games.game_state ? 'board_image' THEN jsonb_build_object("
+    "'message_id', games.game_state->'message_id', 'board_image', games.game_state->'board_image') "
+    "ELSE '{}'::jsonb END"
+)
+
+async def update_game(pool: asyncpg.Pool, game_id: int, created_at: datetime, new_state: Dict[str, Any], status: str,
+                      from_statuses: tuple = ('lobby', 'active')) -> bool:
+    """Updates a game's state and status. `created_at` comes from the fetched row and prunes the write to its partition.
+
+    Returns False without writing if the game has meanwhile left `from_statuses` (e.g. it was settled),
+    so a stale in-flight state can never reopen a closed game.
+    """
+    updated = await pool.fetchval(
+        f"UPDATE games SET game_state = {_STATE_WITH_STORED_MESSAGE}, status = $2, last_action_at = NOW() "
+        "WHERE game_id = $3 AND created_at = $4 AND status = ANY($5::text[]) RETURNING game_id",
+        json.dumps(new_state), status, game_id, created_at, list(from_statuses)
+    )
+    return updated is not None
+
+async def set_game_message(pool: asyncpg.Pool, game_id: int, created_at: datetime, message_fields: Dict[str, Any]):
+    """Merges message bookkeeping (e.g. `message_id`) into a game's state without touching the rest of it."""
     await pool.execute(
-        "UPDATE games SET game_state = $1, status = $2, last_action_at = NOW() WHERE game_id = $3",
-        json.dumps(new_state), status, game_id
+        "UPDATE games SET game_state = game_state || $1::jsonb WHERE game_id = $2 AND created_at = $3",
+        json.dumps(message_fields), game_id, created_at
+    )
+
+async def settle_game(pool: asyncpg.Pool, game_id: int, created_at: datetime, new_state: Dict[str, Any], status: str, winner_id: int, prize: Decimal) -> bool:
+    """Closes an active game, pays the winner and updates both players' stats in one transaction.
+
+    Returns False without changing anything if the game was already settled.
+    """
+    winner_id = int(winner_id)
+    stake = Decimal(new_state['stake_per_player'])
+    player_ids = [int(pid) for pid in new_state['player_order']]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            settled = await conn.fetchval(
+                f"UPDATE games SET game_state = {_STATE_WITH_STORED_MESSAGE}, status = $2, last_action_at = NOW() "
+                "WHERE game_id = $3 AND created_at = $4 AND status = 'active' RETURNING game_id",
+                json.dumps(new_state), status, game_id, created_at
+            )
+            if settled is None:
+                return False
+            await conn.execute("UPDATE users SET balance = balance + $1 WHERE telegram_id = $2", prize, winner_id)
+            await conn.executemany(
+                """
+                INSERT INTO user_stats AS s (telegram_id, games_played, games_won, total_staked, net_winnings, current_streak, best_streak)
+                VALUES ($1, 1, $2::int, $3, $4, $2::int, $2::int)
+                ON CONFLICT (telegram_id) DO UPDATE SET
+                    games_played = s.games_played + 1,
+                    games_won = s.games_won + EXCLUDED.games_won,
+                    total_staked = s.total_staked + EXCLUDED.total_staked,
+                    net_winnings = s.net_winnings + EXCLUDED.net_winnings,
+                    current_streak = CASE WHEN EXCLUDED.games_won = 1 THEN s.current_streak + 1 ELSE 0 END,
+                    best_streak = GREATEST(s.best_streak, CASE WHEN EXCLUDED.games_won = 1 THEN s.current_streak + 1 ELSE 0 END),
+                    updated_at = NOW()
+                """,
+                [
+                    (pid, int(pid == winner_id), stake, (prize - stake) if pid == winner_id else -stake)
+                    for pid in player_ids
+                ]
+            )
+            return True
+
+# --- Player Statistics ---
+async def get_user_stats(pool: asyncpg.Pool, telegram_id: int) -> Optional[Dict[str, Any]]:
+    """Retrieves a player's aggregate record."""
+    record = await pool.fetchrow("SELECT * FROM user_stats WHERE telegram_id = $1", telegram_id)
+    return dict(record) if record else None
+
+async def get_top_players(pool: asyncpg.Pool, limit: int = 10) -> List[Dict[str, Any]]:
+    """Returns the top players by net winnings, served from the ranking index."""
+    records = await pool.fetch(
+        """
+        SELECT s.telegram_id, u.username, s.games_played, s.games_won, s.net_winnings, s.best_streak
+        FROM user_stats s LEFT JOIN users u ON u.telegram_id = s.telegram_id
+        ORDER BY s.net_winnings DESC, s.games_won DESC
+        LIMIT $1
+        """,
+        limit
+    )
+    return [dict(r) for r in records]
+
+# --- Archival & Retention ---
+def _archive_summary(record: asyncpg.Record) -> tuple:
+    state = json.loads(record['game_state'])
+    player_ids = [int(pid) for pid in state.get('player_order', [])]
+    winner = state.get('winner')
+    return (
+        record['game_id'], record['status'], int(winner) if winner is not None else None, player_ids,
+        Decimal(state.get('stake_per_player', 0)), Decimal(state.get('pot', 0)),
+        record['created_at'], record['last_action_at'],
+        zlib.compress(record['game_state'].encode(), 9),
+    )
+
+async def expire_stale_lobbies(pool: asyncpg.Pool) -> int:
+    """Marks lobbies nobody joined within LOBBY_TTL as expired. No stakes are held for lobbies."""
+    result = await pool.execute(
+        "UPDATE games SET status = 'expired', last_action_at = NOW() WHERE status = 'lobby' AND created_at < $1",
+        datetime.now(timezone.utc) - LOBBY_TTL
     )
+    return int(result.split()[-1])
+
+async def refund_stranded_games(pool: asyncpg.Pool, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Refunds both stakes of active games that outlived MAX_GAME_AGE or sat idle past STALE_ACTIVE_AFTER.
+
+    Such games lost their timeout task (e.g. to a restart) and would otherwise keep the stakes forever.
+    """
+    now = datetime.now(timezone.utc)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            records = await conn.fetch(
+                """
+                SELECT game_id, created_at, game_state FROM games
+                WHERE status = 'active' AND (created_at < $1 OR last_action_at < $2)
+                LIMIT $3
+                FOR UPDATE SKIP LOCKED
+                """,
+                now - MAX_GAME_AGE, now - STALE_ACTIVE_AFTER, batch_size
+            )
+            for record in records:
+                state = json.loads(record['game_state'])
+                state['status'] = 'refunded'
+                await conn.executemany(
+                    "UPDATE users SET balance = balance + $1 WHERE telegram_id = $2",
+                    [(Decimal(state['stake_per_player']), int(pid)) for pid in state['player_order']]
+                )
+                await conn.execute(
+                    "UPDATE games SET game_state = $1, status = 'refunded', last_action_at = NOW() WHERE game_id = $2 AND created_at = $3",
+                    json.dumps(state), record['game_id'], record['created_at']
+                )
+            return len(records)
+
+async def archive_finished_games(pool: asyncpg.Pool, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Moves one batch of settled games into `games_archive` with their state compressed."""
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            records = await conn.fetch(
+                """
+                SELECT * FROM games
+                WHERE status IN ('finished', 'forfeited', 'expired', 'refunded') AND last_action_at < $1
+                ORDER BY last_action_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+                """,
+                datetime.now(timezone.utc) - ARCHIVE_AFTER, batch_size
+            )
+            if not records:
+                return 0
+            await conn.executemany(
+                """
+                INSERT INTO games_archive (game_id, status, winner_id, player_ids, stake, pot, created_at, finished_at, state_z)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                ON CONFLICT (game_id) DO NOTHING
+                """,
+                [_archive_summary(r) for r in records]
+            )
+            await conn.execute(
+                "DELETE FROM games WHERE (game_id, created_at) IN (SELECT * FROM unnest($1::int[], $2::timestamptz[]))",
+                [r['game_id'] for r in records], [r['created_at'] for r in records]
+            )
+            return len(records)
+
+async def run_storage_maintenance(pool: asyncpg.Pool) -> Dict[str, Any]:
+    """Creates upcoming partitions, expires stale lobbies, refunds stranded games, archives settled games and drops empty old partitions."""
+    async with pool.acquire() as conn:
+        await ensure_partitions(conn, 'games')
+    expired = await expire_stale_lobbies(pool)
+    refunded = await refund_stranded_games(pool)
+    archived = 0
+    while True:
+        moved = await archive_finished_games(pool)
+        archived += moved
+        if moved < ARCHIVE_BATCH_SIZE:
+            break
+    async with pool.acquire() as conn:
+        dropped = await drop_expired_partitions(conn, 'games')
+    return {'expired': expired, 'refunded': refunded, 'archived': archived, 'dropped': dropped}
 
 # --- Withdrawal Management ---
 async def create_withdrawal_request(pool: asyncpg.Pool, telegram_id: int, amount: Decimal, account_details: str) -> int:
@@ -121,4 +484,11 @@ async def create_withdrawal_request(pool: asyncpg.Pool, telegram_id: int, amount
         "INSERT INTO withdrawals (telegram_id, amount, account_details, status) VALUES ($1, $2, $3, 'pending') RETURNING withdrawal_id",
         telegram_id, amount, account_details
     )
-    return req_id
\ No newline at end of file
+    return req_id
+
+async def update_withdrawal_status(pool: asyncpg.Pool, withdrawal_id: int, status: str):
+    """Updates the status of a withdrawal request. The `stamp_settled_at` trigger maintains `settled_at`."""
+    await pool.execute(
+        "UPDATE withdrawals SET status = $1 WHERE withdrawal_id = $2 AND status IS DISTINCT FROM $1",
+        status, withdrawal_id
+    )
\ No newline at end of file
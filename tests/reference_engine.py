@@ -0,0 +1,118 @@
+"""A deliberately naive Ludo engine used as the oracle for differential tests.
+
+Tokens are tracked as steps travelled from their colour's start square
+(-1 yard, 0-50 main track, 51-56 home path, 57 home), which makes every rule a
+direct comparison. It shares only the board constants with `LudoGame`.
+"""
+from typing import Dict, List
+
+from bot.game_logic import LudoGame
+
+YARD, LAST_TRACK_STEP, HOME = -1, 50, 57
+
+def to_engine_position(color: str, step: int) -> int:
+    """Converts a step count into the absolute/home-path encoding LudoGame stores."""
+    if step == YARD:
+        return -1
+    if step <= LAST_TRACK_STEP:
+        return (LudoGame.PLAYER_STARTS[color] + step) % LudoGame.BOARD_SIZE
+    return 100 + step - LAST_TRACK_STEP
+
+def from_engine_position(color: str, pos: int) -> int:
+    if pos == -1:
+        return YARD
+    if pos >= 101:
+        return LAST_TRACK_STEP + pos - 100
+    return (pos - LudoGame.PLAYER_STARTS[color]) % LudoGame.BOARD_SIZE
+
+class ReferenceLudo:
+    def __init__(self, colors: Dict[int, str], player_order: List[int], win_condition: int):
+        self.colors = colors
+        self.order = list(player_order)
+        self.win_condition = win_condition
+        self.steps = {pid: [YARD] * 4 for pid in colors}
+        self.turn = 0
+        self.sixes = 0
+        self.winner = None
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'ReferenceLudo':
+        players = {int(pid): pdata for pid, pdata in state['players'].items()}
+        ref = cls({pid: p['color'] for pid, p in players.items()}, state['player_order'], state['win_condition'])
+        for pid, pdata in players.items():
+            ref.steps[pid] = [from_engine_position(pdata['color'], pos) for pos in pdata['tokens']]
+        ref.turn = state['turn_index']
+        ref.sixes = len(state['roll_history'])
+        return ref
+
+    def current(self) -> int:
+        return self.order[self.turn]
+
+    def square(self, pid: int, step: int) -> int:
+        return to_engine_position(self.colors[pid], step)
+
+    def is_blocked(self, pid: int, square: int) -> bool:
+        for other, steps in self.steps.items():
+            if other == pid:
+                continue
+            on_square = [s for s in steps if 0 <= s <= LAST_TRACK_STEP and self.square(other, s) == square]
+            if len(on_square) >= 2:
+                return True
+        return False
+
+    def legal_moves(self, pid: int, roll: int) -> List[int]:
+        moves = []
+        for i, step in enumerate(self.steps[pid]):
+            if step == YARD:
+                if roll == 6 and not self.is_blocked(pid, self.square(pid, 0)):
+                    moves.append(i)
+                continue
+            if step + roll > HOME:
+                continue
+            track_steps = [s for s in range(step + 1, step + roll + 1) if s <= LAST_TRACK_STEP]
+            if any(self.is_blocked(pid, self.square(pid, s)) for s in track_steps):
+                continue
+            moves.append(i)
+        return moves
+
+    def next_turn(self):
+        self.turn = (self.turn + 1) % len(self.order)
+        self.sixes = 0
+
+    def roll(self, roll: int) -> bool:
+        """Applies a roll; returns True if the roller now has to pick a token."""
+        pid = self.current()
+        if roll == 6:
+            self.sixes += 1
+            if self.sixes == 3:
+                self.next_turn()
+                return False
+        else:
+            self.sixes = 0
+        if not self.legal_moves(pid, roll):
+            self.next_turn()
+            return False
+        return True
+
+    def move(self, pid: int, token: int, roll: int):
+        step = self.steps[pid][token]
+        new_step = 0 if step == YARD else step + roll
+        self.steps[pid][token] = new_step
+        if new_step <= LAST_TRACK_STEP:
+            square = self.square(pid, new_step)
+            if square not in LudoGame.SAFE_ZONES:
+                for other, steps in self.steps.items():
+                    if other == pid:
+                        continue
+                    for j, s in enumerate(steps):
+                        if 0 <= s <= LAST_TRACK_STEP and self.square(other, s) == square:
+                            steps[j] = YARD
+        for candidate in self.order:
+            if sum(1 for s in self.steps[candidate] if s == HOME) >= self.win_condition:
+                self.winner = candidate
+                return
+        if roll != 6:
+            self.next_turn()
+
+    def engine_tokens(self) -> Dict[int, List[int]]:
+        return {pid: [self.square(pid, s) for s in steps] for pid, steps in self.steps.items()}
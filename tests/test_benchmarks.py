@@ -0,0 +1,38 @@
+import copy
+
+import pytest
+
+from bot.game_logic import LudoGame
+from bot.renderer import render_board
+
+pytest.importorskip("pytest_benchmark")
+
+def midgame() -> LudoGame:
+    """A reproducible position with tokens in the yard, on the track and on the home path."""
+    game = LudoGame.new_game(111, "alice", 20, 4, server_seed="5a" * 32)
+    game.state['game_id'] = 1
+    game.add_player(222, "bob")
+    for pid, tokens in zip(game.state['player_order'], ([-1, 6, 30, 103], [-1, -1, 28, 44])):
+        game.state['players'][pid]['tokens'] = tokens
+    return game
+
+def test_roll_dice(benchmark):
+    base = midgame()
+    benchmark.pedantic(lambda game: game.roll_dice(), setup=lambda: ((LudoGame(copy.deepcopy(base.state)),), {}), rounds=2000)
+
+def test_get_possible_moves(benchmark):
+    game = midgame()
+    benchmark(game.get_possible_moves, game.current_player_id(), 6)
+
+def test_move_token(benchmark):
+    base = midgame()
+    base.state['dice_roll'] = 6
+    player_id = base.current_player_id()
+    benchmark.pedantic(
+        lambda game: game.move_token(player_id, 2),
+        setup=lambda: ((LudoGame(copy.deepcopy(base.state)),), {}), rounds=2000
+    )
+
+def test_render_board(benchmark):
+    game = midgame()
+    benchmark(render_board, game.state)
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from bot.game_logic import LudoGame
+from tests.reference_engine import ReferenceLudo
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st
+
+VALID_POSITIONS = {-1, *range(LudoGame.BOARD_SIZE), *range(101, 108)}
+
+seeds = st.binary(min_size=32, max_size=32).map(bytes.hex)
+choices = st.lists(st.integers(min_value=0, max_value=3), min_size=1, max_size=300)
+win_conditions = st.sampled_from([1, 2, 4])
+
+def start_game(seed: str, win_condition: int, game_id: int = 1) -> LudoGame:
+    game = LudoGame.new_game(111, "alice", 20, win_condition, server_seed=seed)
+    game.state['game_id'] = game_id
+    game.add_player(222, "bob")
+    return game
+
+def reload(game: LudoGame) -> LudoGame:
+    """Round-trips the state through JSON the way db.manager stores it."""
+    return LudoGame(json.loads(json.dumps(game.state)))
+
+def all_tokens(game: LudoGame):
+    return {pid: list(p['tokens']) for pid, p in game.state['players'].items()}
+
+def play(seed: str, win_condition: int, picks, on_step=None) -> LudoGame:
+    game = start_game(seed, win_condition)
+    for pick in picks:
+        if game.state['status'] != 'active':
+            break
+        game = reload(game)
+        game.roll_dice()
+        roll = game.state['dice_roll']
+        if roll is None:
+            continue
+        player_id = game.current_player_id()
+        moves = game.get_possible_moves(player_id, roll)
+        before = all_tokens(game)
+        game.move_token(player_id, moves[pick % len(moves)])
+        if on_step:
+            on_step(before, all_tokens(game), player_id)
+    return game
+
+@settings(max_examples=60, deadline=None)
+@given(seeds, win_conditions, choices)
+def test_tokens_are_conserved_and_never_overshoot(seed, win_condition, picks):
+    def check(before, after, mover):
+        for pid, tokens in after.items():
+            assert len(tokens) == 4
+            assert set(tokens) <= VALID_POSITIONS
+
+    game = play(seed, win_condition, picks, check)
+    assert all(pos <= 107 for tokens in all_tokens(game).values() for pos in tokens)
+
+@settings(max_examples=60, deadline=None)
+@given(seeds, win_conditions, choices)
+def test_knockouts_only_happen_off_safe_squares(seed, win_condition, picks):
+    def check(before, after, mover):
+        for pid in after:
+            if pid == mover:
+                continue
+            for old, new in zip(before[pid], after[pid]):
+                if old != new:
+                    assert new == -1
+                    assert old not in LudoGame.SAFE_ZONES
+
+    play(seed, win_condition, picks, check)
+
+@settings(max_examples=60, deadline=None)
+@given(seeds, win_conditions, choices)
+def test_matches_reference_engine(seed, win_condition, picks):
+    game = start_game(seed, win_condition)
+    ref = ReferenceLudo.from_state(game.state)
+    for pick in picks:
+        if game.state['status'] != 'active':
+            break
+        game = reload(game)
+        player_id = game.current_player_id()
+        assert ref.current() == player_id
+        roll = game.roll_dice()
+        must_move = ref.roll(roll)
+        assert must_move == (game.state['dice_roll'] is not None)
+        assert ref.current() == game.current_player_id()
+        if not must_move:
+            continue
+        moves = game.get_possible_moves(player_id, roll)
+        assert moves == ref.legal_moves(player_id, roll)
+        token = moves[pick % len(moves)]
+        result = game.move_token(player_id, token)
+        ref.move(player_id, token, roll)
+        assert all_tokens(game) == ref.engine_tokens()
+        assert (result or {}).get('winner') == ref.winner
+        if ref.winner is None:
+            assert ref.current() == game.current_player_id()
+
+def test_same_seed_replays_the_same_game():
+    seed = "ab" * 32
+    first = play(seed, 2, [0, 1, 2, 3] * 50)
+    second = play(seed, 2, [0, 1, 2, 3] * 50)
+    assert first.state == second.state
+
+def test_state_survives_json_round_trip():
+    game = reload(start_game("cd" * 32, 1))
+    assert set(game.state['players']) == {111, 222}
+    assert game.get_possible_moves(game.current_player_id(), 6) == [0, 1, 2, 3]
+
+def test_cannot_land_on_or_pass_an_opponent_block():
+    game = start_game("ef" * 32, 4)
+    red = next(pid for pid, p in game.state['players'].items() if p['color'] == 'RED')
+    yellow = next(pid for pid, p in game.state['players'].items() if p['color'] == 'YELLOW')
+    game.state['players'][yellow]['tokens'] = [5, 5, -1, -1]
+    game.state['players'][red]['tokens'] = [3, 1, 7, -1]
+    assert not game.is_move_valid(red, 0, 2)  # lands on the block
+    assert not game.is_move_valid(red, 1, 6)  # passes over it
+    assert game.is_move_valid(red, 2, 3)      # block is behind
+    game.state['turn_index'] = game.state['player_order'].index(red)
+    game.state['dice_roll'] = 2
+    with pytest.raises(ValueError):
+        game.move_token(red, 0)
+
+def test_block_past_home_entry_does_not_stop_a_token_entering_home():
+    game = start_game("34" * 32, 4)
+    red = next(pid for pid, p in game.state['players'].items() if p['color'] == 'RED')
+    yellow = next(pid for pid, p in game.state['players'].items() if p['color'] == 'YELLOW')
+    game.state['players'][red]['tokens'] = [50, -1, -1, -1]
+    game.state['players'][yellow]['tokens'] = [51, 51, -1, -1]
+    assert game.get_possible_moves(red, 3) == [0]
+    assert ReferenceLudo.from_state(game.state).legal_moves(red, 3) == [0]
+    game.state['players'][yellow]['tokens'] = [24, -1, -1, -1]
+    game.state['players'][red]['tokens'] = [25, 25, -1, -1]
+    assert game.get_possible_moves(yellow, 2) == [0]
+    assert ReferenceLudo.from_state(game.state).legal_moves(yellow, 2) == [0]
+
+def test_move_requires_a_roll():
+    game = start_game("12" * 32, 1)
+    with pytest.raises(ValueError):
+        game.move_token(game.current_player_id(), 0)